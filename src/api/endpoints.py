@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from datetime import datetime
+from types import MappingProxyType
+import traceback
 import uuid
+import orjson
 
 from src.core.config import config
 from src.core.logging import logger
-from src.core.client import OpenAIClient
+from src.core.client import get_openai_client
 from src.models.claude import ClaudeMessagesRequest, ClaudeTokenCountRequest
 from src.conversion.request_converter import convert_claude_to_openai
 from src.conversion.response_converter import (
@@ -16,7 +19,17 @@ from src.core.model_manager import model_manager
 
 router = APIRouter()
 
-openai_client = OpenAIClient(
+# Headers sent with every SSE response; frozen so no request can mutate them
+SSE_HEADERS = MappingProxyType(
+    {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "*",
+    }
+)
+
+openai_client = get_openai_client(
     config.openai_api_key,
     config.openai_base_url,
     config.request_timeout,
@@ -61,7 +74,6 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request):
                 except Exception as e:
                     # Handle streaming errors gracefully by yielding an error event
                     logger.error(f"Streaming error: {str(e)}")
-                    import traceback
                     logger.error(traceback.format_exc())
                     
                     error_message = openai_client.classify_openai_error(str(e))
@@ -72,18 +84,12 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request):
                             "message": error_message
                         }
                     }
-                    import json
-                    yield f"event: error\ndata: {json.dumps(error_event, ensure_ascii=False)}\n\n"
+                    yield b"event: error\ndata: " + orjson.dumps(error_event) + b"\n\n"
             
             return StreamingResponse(
                 safe_streaming_response(),
                 media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "*",
-                },
+                headers=SSE_HEADERS,
             )
         else:
             # Non-streaming response
@@ -103,12 +109,11 @@ async def create_message(request: ClaudeMessagesRequest, http_request: Request):
                         detail=f"Output tokens ({output_tokens}) is less than minimum limit ({config.min_tokens_limit}))",
                     )
             
-            return claude_response
+            # Hand the dict straight to orjson instead of letting FastAPI run jsonable_encoder over it
+            return ORJSONResponse(claude_response)
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-
         logger.error(f"Unexpected error processing request: {e}")
         logger.error(traceback.format_exc())
         error_message = openai_client.classify_openai_error(str(e))
@@ -185,7 +190,7 @@ async def test_connection():
 
     except Exception as e:
         logger.error(f"API connectivity test failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "failed",
@@ -1,6 +1,8 @@
-import json
-import uuid
+import time
+import traceback
 import logging
+import orjson
+from secrets import token_hex
 from fastapi import HTTPException, Request
 from src.core.constants import Constants
 from src.core.token_estimator import (
@@ -14,6 +16,103 @@ from src.models.claude import ClaudeMessagesRequest
 logger = logging.getLogger(__name__)
 
 
+# Module-level aliases for names read on every streamed chunk
+_json_dumps = orjson.dumps
+_json_loads = orjson.loads
+_EVT_CBS = Constants.EVENT_CONTENT_BLOCK_START
+_EVT_CBD = Constants.EVENT_CONTENT_BLOCK_DELTA
+_DELTA_TEXT = Constants.DELTA_TEXT
+_DELTA_INPUT_JSON = Constants.DELTA_INPUT_JSON
+_CONTENT_TOOL_USE = Constants.CONTENT_TOOL_USE
+_TOOL_FUNC = Constants.TOOL_FUNCTION
+
+# OpenAI finish_reason -> Claude stop_reason
+_FINISH_MAP = {
+    "stop": Constants.STOP_END_TURN,
+    "length": Constants.STOP_MAX_TOKENS,
+    "tool_calls": Constants.STOP_TOOL_USE,
+    "function_call": Constants.STOP_TOOL_USE,
+}
+
+# Poll for client disconnects every N upstream lines or after this many seconds
+_DISCONNECT_CHECK_LINES = 16
+_DISCONNECT_CHECK_INTERVAL = 0.05
+
+
+class _ToolCallState:
+    """Progress of one streamed tool call, keyed by its OpenAI index."""
+
+    __slots__ = ("id", "name", "claude_index", "started")
+
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.claude_index = None
+        self.started = False
+
+
+def _sse_prefix(event: str) -> bytes:
+    """Render the ``event:``/``data:`` header of an SSE frame."""
+    return b"event: " + event.encode() + b"\ndata: "
+
+
+def _sse(event: str, payload: dict) -> bytes:
+    """Encode a single Server-Sent Event frame."""
+    return _sse_prefix(event) + _json_dumps(payload) + b"\n\n"
+
+
+# Per-event frame headers for the frames built while streaming
+_E_CBS = _sse_prefix(Constants.EVENT_CONTENT_BLOCK_START)
+_E_CBD = _sse_prefix(Constants.EVENT_CONTENT_BLOCK_DELTA)
+_E_CB_STOP = _sse_prefix(Constants.EVENT_CONTENT_BLOCK_STOP)
+_E_MSG_DELTA = _sse_prefix(Constants.EVENT_MESSAGE_DELTA)
+_E_ERROR = _sse_prefix("error")
+
+
+# Frames that are identical for every request, rendered once at import
+_PING_FRAME = _sse(Constants.EVENT_PING, {"type": Constants.EVENT_PING})
+_MESSAGE_STOP_FRAME = _sse(Constants.EVENT_MESSAGE_STOP, {"type": Constants.EVENT_MESSAGE_STOP})
+_TEXT_BLOCK_START_FRAME = _sse(
+    Constants.EVENT_CONTENT_BLOCK_START,
+    {
+        "type": Constants.EVENT_CONTENT_BLOCK_START,
+        "index": 0,
+        "content_block": {"type": Constants.CONTENT_TEXT, "text": ""},
+    },
+)
+
+# message_start only varies by id and model, so render it once around placeholders
+_MESSAGE_START_PREFIX, _rest = _sse(
+    Constants.EVENT_MESSAGE_START,
+    {
+        "type": Constants.EVENT_MESSAGE_START,
+        "message": {
+            "id": "__message_id__",
+            "type": "message",
+            "role": Constants.ROLE_ASSISTANT,
+            "model": "__model__",
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 0, "output_tokens": 0},
+        },
+    },
+).split(b'"__message_id__"')
+_MESSAGE_START_MIDDLE, _MESSAGE_START_SUFFIX = _rest.split(b'"__model__"')
+del _rest
+
+
+def _message_start_frame(message_id: str, model: str) -> bytes:
+    """Render the message_start frame from the precomputed template."""
+    return (
+        _MESSAGE_START_PREFIX
+        + orjson.dumps(message_id)
+        + _MESSAGE_START_MIDDLE
+        + orjson.dumps(model)
+        + _MESSAGE_START_SUFFIX
+    )
+
+
 def convert_openai_to_claude_response(
     openai_response: dict, original_request: ClaudeMessagesRequest
 ) -> dict:
@@ -26,29 +125,54 @@ def convert_openai_to_claude_response(
 
     choice = choices[0]
     message = choice.get("message", {})
+    text_content = message.get("content")
+    tool_calls = message.get("tool_calls", []) or []
+
+    # Map finish reason
+    finish_reason = choice.get("finish_reason", "stop")
+    stop_reason = _FINISH_MAP.get(finish_reason, Constants.STOP_END_TURN)
+
+    # Get usage data from OpenAI response
+    usage_data = openai_response.get("usage") or {}
+    input_tokens = usage_data.get("prompt_tokens", 0)
+    output_tokens = usage_data.get("completion_tokens", 0)
+    use_estimation = (
+        config.enable_token_estimation
+        and (input_tokens == 0 or output_tokens == 0)
+        and should_use_estimation(usage_data)
+    )
+
+    # Fast path: plain text reply with usage reported by the upstream API
+    if text_content and not tool_calls and not use_estimation:
+        return _build_claude_response(
+            openai_response,
+            original_request,
+            [{"type": Constants.CONTENT_TEXT, "text": text_content}],
+            stop_reason,
+            input_tokens,
+            output_tokens,
+        )
 
     # Build Claude content blocks
     content_blocks = []
 
     # Add text content
-    text_content = message.get("content")
     if text_content:
         content_blocks.append({"type": Constants.CONTENT_TEXT, "text": text_content})
 
     # Add tool calls
-    tool_calls = message.get("tool_calls", []) or []
     for tool_call in tool_calls:
         if tool_call.get("type") == Constants.TOOL_FUNCTION:
             function_data = tool_call.get(Constants.TOOL_FUNCTION, {})
             try:
-                arguments = json.loads(function_data.get("arguments", "{}"))
-            except json.JSONDecodeError:
+                arguments = orjson.loads(function_data.get("arguments", "{}"))
+            except orjson.JSONDecodeError:
                 arguments = {"raw_arguments": function_data.get("arguments", "")}
 
             content_blocks.append(
                 {
                     "type": Constants.CONTENT_TOOL_USE,
-                    "id": tool_call.get("id", f"tool_{uuid.uuid4()}"),
+                    "id": tool_call.get("id") or "tool_" + token_hex(16),
                     "name": function_data.get("name", ""),
                     "input": arguments,
                 }
@@ -58,42 +182,47 @@ def convert_openai_to_claude_response(
     if not content_blocks:
         content_blocks.append({"type": Constants.CONTENT_TEXT, "text": ""})
 
-    # Map finish reason
-    finish_reason = choice.get("finish_reason", "stop")
-    stop_reason = {
-        "stop": Constants.STOP_END_TURN,
-        "length": Constants.STOP_MAX_TOKENS,
-        "tool_calls": Constants.STOP_TOOL_USE,
-        "function_call": Constants.STOP_TOOL_USE,
-    }.get(finish_reason, Constants.STOP_END_TURN)
-
-    # Get usage data from OpenAI response
-    usage_data = openai_response.get("usage", {})
-    input_tokens = usage_data.get("prompt_tokens", 0)
-    output_tokens = usage_data.get("completion_tokens", 0)
-    
     # Use token estimation if enabled and downstream API doesn't provide accurate usage
-    if config.enable_token_estimation and should_use_estimation(usage_data):
+    if use_estimation:
         logger.debug("Downstream API usage data is incomplete, using token estimation")
         
         # Estimate input tokens from original request
         estimated_input = estimate_input_tokens(original_request)
         
         # Estimate output tokens from response content
-        response_text = ""
-        for block in content_blocks:
-            if block.get("type") == Constants.CONTENT_TEXT:
-                response_text += block.get("text", "")
-        estimated_output = estimate_output_tokens(response_text)
+        response_text = "".join(
+            block.get("text", "")
+            for block in content_blocks
+            if block.get("type") == Constants.CONTENT_TEXT
+        )
+        estimated_output = estimate_output_tokens(response_text) if response_text else 0
         
         input_tokens = estimated_input
         output_tokens = estimated_output
         
-        logger.info(f"📊 Using estimated tokens - Input: {input_tokens}, Output: {output_tokens}")
+        logger.info("📊 Using estimated tokens - Input: %d, Output: %d", input_tokens, output_tokens)
+
+    return _build_claude_response(
+        openai_response,
+        original_request,
+        content_blocks,
+        stop_reason,
+        input_tokens,
+        output_tokens,
+    )
 
-    # Build Claude response
+
+def _build_claude_response(
+    openai_response: dict,
+    original_request: ClaudeMessagesRequest,
+    content_blocks: list,
+    stop_reason: str,
+    input_tokens: int,
+    output_tokens: int,
+) -> dict:
+    """Assemble the Claude message and log its token usage."""
     claude_response = {
-        "id": openai_response.get("id", f"msg_{uuid.uuid4()}"),
+        "id": openai_response.get("id") or "msg_" + token_hex(16),
         "type": "message",
         "role": Constants.ROLE_ASSISTANT,
         "model": original_request.model,
@@ -107,10 +236,12 @@ def convert_openai_to_claude_response(
     }
 
     # Log token usage info to console
-    input_tokens = claude_response["usage"]["input_tokens"]
-    output_tokens = claude_response["usage"]["output_tokens"]
     # Always log token usage for debugging, even if tokens are 0
-    logger.info(f"🎯 Token Usage | Model: {original_request.model} → {openai_response.get('model', 'unknown')} | Input: {input_tokens} | Output: {output_tokens} | Total: {input_tokens + output_tokens}")
+    logger.info(
+        "🎯 Token Usage | Model: %s → %s | Input: %d | Output: %d | Total: %d",
+        original_request.model, openai_response.get("model", "unknown"),
+        input_tokens, output_tokens, input_tokens + output_tokens,
+    )
 
     return claude_response
 
@@ -119,179 +250,8 @@ async def convert_openai_streaming_to_claude(
     openai_stream, original_request: ClaudeMessagesRequest, logger
 ):
     """Convert OpenAI streaming response to Claude streaming format."""
-
-    message_id = f"msg_{uuid.uuid4().hex[:24]}"
-
-    # Send initial SSE events
-    yield f"event: {Constants.EVENT_MESSAGE_START}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_START, 'message': {'id': message_id, 'type': 'message', 'role': Constants.ROLE_ASSISTANT, 'model': original_request.model, 'content': [], 'stop_reason': None, 'stop_sequence': None, 'usage': {'input_tokens': 0, 'output_tokens': 0}}}, ensure_ascii=False)}\n\n"
-
-    yield f"event: {Constants.EVENT_CONTENT_BLOCK_START}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_START, 'index': 0, 'content_block': {'type': Constants.CONTENT_TEXT, 'text': ''}}, ensure_ascii=False)}\n\n"
-
-    yield f"event: {Constants.EVENT_PING}\ndata: {json.dumps({'type': Constants.EVENT_PING}, ensure_ascii=False)}\n\n"
-
-    # Process streaming chunks
-    text_block_index = 0
-    tool_block_counter = 0
-    current_tool_calls = {}
-    final_stop_reason = Constants.STOP_END_TURN
-
-    # Track token usage from OpenAI streaming response
-    total_input_tokens = 0
-    total_output_tokens = 0
-
-    try:
-        async for line in openai_stream:
-            if line.strip():
-                # Decode bytes to string if needed
-                if isinstance(line, bytes):
-                    line = line.decode('utf-8')
-                if line.startswith("data: "):
-                    chunk_data = line[6:]
-                    if chunk_data.strip() == "[DONE]":
-                        break
-
-                    try:
-                        chunk = json.loads(chunk_data)
-                        choices = chunk.get("choices", [])
-                        if not choices:
-                            continue
-
-                        # Extract token usage information from chunk if available
-                        usage = chunk.get("usage", {})
-                        if usage:
-                            # Update token counts when usage information is available
-                            if "prompt_tokens" in usage and usage["prompt_tokens"] > 0:
-                                total_input_tokens = usage["prompt_tokens"]
-                                logger.debug(f"[Basic Stream] Updated input tokens: {total_input_tokens}")
-                            if "completion_tokens" in usage and usage["completion_tokens"] > 0:
-                                total_output_tokens = usage["completion_tokens"]
-                                logger.debug(f"[Basic Stream] Updated output tokens: {total_output_tokens}")
-
-                    except json.JSONDecodeError as e:
-                        logger.warning(
-                            f"Failed to parse chunk: {chunk_data}, error: {e}"
-                        )
-                        continue
-
-                    choice = choices[0]
-                    delta = choice.get("delta", {})
-                    finish_reason = choice.get("finish_reason")
-
-                    # Handle text delta
-                    if "content" in delta and delta["content"]:
-                        yield f"event: {Constants.EVENT_CONTENT_BLOCK_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_DELTA, 'index': text_block_index, 'delta': {'type': Constants.DELTA_TEXT, 'text': delta['content']}}, ensure_ascii=False)}\n\n"
-
-                    # Handle tool call deltas with improved incremental processing
-                    if "tool_calls" in delta:
-                        for tc_delta in delta["tool_calls"]:
-                            tc_index = tc_delta.get("index", 0)
-
-                            # Initialize tool call tracking by index if not exists
-                            if tc_index not in current_tool_calls:
-                                current_tool_calls[tc_index] = {
-                                    "id": None,
-                                    "name": None,
-                                    "args_buffer": "",
-                                    "json_sent": False,
-                                    "claude_index": None,
-                                    "started": False
-                                }
-
-                            tool_call = current_tool_calls[tc_index]
-
-                            # Update tool call ID if provided
-                            if tc_delta.get("id"):
-                                tool_call["id"] = tc_delta["id"]
-
-                            # Update function name and start content block if we have both id and name
-                            function_data = tc_delta.get(Constants.TOOL_FUNCTION, {})
-                            if function_data.get("name"):
-                                tool_call["name"] = function_data["name"]
-
-                            # Start content block when we have complete initial data
-                            if (tool_call["id"] and tool_call["name"] and not tool_call["started"]):
-                                tool_block_counter += 1
-                                claude_index = text_block_index + tool_block_counter
-                                tool_call["claude_index"] = claude_index
-                                tool_call["started"] = True
-
-                                yield f"event: {Constants.EVENT_CONTENT_BLOCK_START}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_START, 'index': claude_index, 'content_block': {'type': Constants.CONTENT_TOOL_USE, 'id': tool_call['id'], 'name': tool_call['name'], 'input': {}}}, ensure_ascii=False)}\n\n"
-
-                            # Handle function arguments
-                            if "arguments" in function_data and tool_call["started"]:
-                                tool_call["args_buffer"] += function_data["arguments"]
-
-                                # Try to parse complete JSON and send delta when we have valid JSON
-                                try:
-                                    json.loads(tool_call["args_buffer"])
-                                    # If parsing succeeds and we haven't sent this JSON yet
-                                    if not tool_call["json_sent"]:
-                                        yield f"event: {Constants.EVENT_CONTENT_BLOCK_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_DELTA, 'index': tool_call['claude_index'], 'delta': {'type': Constants.DELTA_INPUT_JSON, 'partial_json': tool_call['args_buffer']}}, ensure_ascii=False)}\n\n"
-                                        tool_call["json_sent"] = True
-                                except json.JSONDecodeError:
-                                    # JSON is incomplete, continue accumulating
-                                    pass
-
-                    # Handle finish reason
-                    if finish_reason:
-                        if finish_reason == "length":
-                            final_stop_reason = Constants.STOP_MAX_TOKENS
-                        elif finish_reason in ["tool_calls", "function_call"]:
-                            final_stop_reason = Constants.STOP_TOOL_USE
-                        elif finish_reason == "stop":
-                            final_stop_reason = Constants.STOP_END_TURN
-                        else:
-                            final_stop_reason = Constants.STOP_END_TURN
-                        break
-
-    except Exception as e:
-        # Handle any streaming errors gracefully
-        logger.error(f"Streaming error: {e}")
-        import traceback
-
-        logger.error(traceback.format_exc())
-        error_event = {
-            "type": "error",
-            "error": {"type": "api_error", "message": f"Streaming error: {str(e)}"},
-        }
-        yield f"event: error\ndata: {json.dumps(error_event, ensure_ascii=False)}\n\n"
-        return
-
-    # Send final SSE events
-    yield f"event: {Constants.EVENT_CONTENT_BLOCK_STOP}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': text_block_index}, ensure_ascii=False)}\n\n"
-
-    for tool_data in current_tool_calls.values():
-        if tool_data.get("started") and tool_data.get("claude_index") is not None:
-            yield f"event: {Constants.EVENT_CONTENT_BLOCK_STOP}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': tool_data['claude_index']}, ensure_ascii=False)}\n\n"
-
-    # Apply token estimation if enabled and usage data is incomplete
-    if config.enable_token_estimation and total_input_tokens == 0 and total_output_tokens == 0:
-        logger.debug("Downstream API usage data is incomplete, using token estimation for basic streaming")
-        
-        # Estimate input tokens from original request
-        estimated_input = estimate_input_tokens(original_request)
-        
-        # For streaming, we need to estimate output tokens from accumulated text
-        # Note: This is a rough estimate since we don't store all the streamed text
-        # We'll use a conservative estimate based on the request's max_tokens
-        max_tokens = getattr(original_request, 'max_tokens', 1024)
-        estimated_output = min(max_tokens // 4, 50)  # Conservative estimate: 1/4 of max_tokens or 50, whichever is smaller
-        
-        total_input_tokens = estimated_input
-        total_output_tokens = estimated_output
-        
-        logger.info(f"📊 Using estimated tokens for basic streaming - Input: {total_input_tokens}, Output: {total_output_tokens} (conservative estimate)")
-
-    usage_data = {"input_tokens": total_input_tokens, "output_tokens": total_output_tokens}
-    logger.debug(f"[Basic Stream] Final usage data: {usage_data}")
-
-    # Log token usage info to console for streaming
-    # Always log token usage for debugging, even if tokens are 0
-    print(f"🔥 DEBUG: Stream Token Usage - Input: {total_input_tokens}, Output: {total_output_tokens}", flush=True)
-    logger.info(f"🎯 Token Usage [Stream] | Model: {original_request.model} | Input: {total_input_tokens} | Output: {total_output_tokens} | Total: {total_input_tokens + total_output_tokens}")
-
-    yield f"event: {Constants.EVENT_MESSAGE_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_DELTA, 'delta': {'stop_reason': final_stop_reason, 'stop_sequence': None}, 'usage': usage_data}, ensure_ascii=False)}\n\n"
-    yield f"event: {Constants.EVENT_MESSAGE_STOP}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_STOP}, ensure_ascii=False)}\n\n"
+    async for frame in _convert_openai_stream(openai_stream, original_request, logger):
+        yield frame
 
 
 async def convert_openai_streaming_to_claude_with_cancellation(
@@ -303,15 +263,36 @@ async def convert_openai_streaming_to_claude_with_cancellation(
     request_id: str,
 ):
     """Convert OpenAI streaming response to Claude streaming format with cancellation support."""
+    async for frame in _convert_openai_stream(
+        openai_stream,
+        original_request,
+        logger,
+        cancellation=(http_request, openai_client, request_id),
+    ):
+        yield frame
 
-    message_id = f"msg_{uuid.uuid4().hex[:24]}"
 
-    # Send initial SSE events
-    yield f"event: {Constants.EVENT_MESSAGE_START}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_START, 'message': {'id': message_id, 'type': 'message', 'role': Constants.ROLE_ASSISTANT, 'model': original_request.model, 'content': [], 'stop_reason': None, 'stop_sequence': None, 'usage': {'input_tokens': 0, 'output_tokens': 0}}}, ensure_ascii=False)}\n\n"
+async def _convert_openai_stream(
+    openai_stream, original_request: ClaudeMessagesRequest, logger, cancellation=None
+):
+    """Shared implementation of the streaming converters.
+
+    ``cancellation`` is an optional ``(http_request, openai_client, request_id)``
+    tuple. When given, the client connection is polled and the upstream request
+    is cancelled once the client goes away.
+    """
+    if cancellation is not None:
+        http_request, openai_client, request_id = cancellation
+        stream_tag = "[Stream+Cancel]"
+    else:
+        stream_tag = "[Stream]"
 
-    yield f"event: {Constants.EVENT_CONTENT_BLOCK_START}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_START, 'index': 0, 'content_block': {'type': Constants.CONTENT_TEXT, 'text': ''}}, ensure_ascii=False)}\n\n"
+    message_id = "msg_" + token_hex(12)
 
-    yield f"event: {Constants.EVENT_PING}\ndata: {json.dumps({'type': Constants.EVENT_PING}, ensure_ascii=False)}\n\n"
+    # Send initial SSE events
+    yield _message_start_frame(message_id, original_request.model)
+    yield _TEXT_BLOCK_START_FRAME
+    yield _PING_FRAME
 
     # Process streaming chunks
     text_block_index = 0
@@ -323,25 +304,38 @@ async def convert_openai_streaming_to_claude_with_cancellation(
     total_input_tokens = 0
     total_output_tokens = 0
 
+    # Throttle disconnect polling, it awaits the ASGI receive channel
+    lines_since_check = 0
+    last_check = time.monotonic()
+
     try:
         async for line in openai_stream:
             # Check if client disconnected
-            if await http_request.is_disconnected():
-                logger.info(f"Client disconnected, cancelling request {request_id}")
-                openai_client.cancel_request(request_id)
-                break
-
-            if line.strip():
-                # Decode bytes to string if needed
-                if isinstance(line, bytes):
-                    line = line.decode('utf-8')
-                if line.startswith("data: "):
+            if cancellation is not None:
+                lines_since_check += 1
+                now = time.monotonic()
+                if (
+                    lines_since_check >= _DISCONNECT_CHECK_LINES
+                    or now - last_check >= _DISCONNECT_CHECK_INTERVAL
+                ):
+                    lines_since_check = 0
+                    last_check = now
+                    if await http_request.is_disconnected():
+                        logger.info("Client disconnected, cancelling request %s", request_id)
+                        openai_client.cancel_request(request_id)
+                        break
+
+            if line and not line.isspace():
+                # Work on raw bytes, orjson parses them without a decode step
+                if isinstance(line, str):
+                    line = line.encode()
+                if line.startswith(b"data: "):
                     chunk_data = line[6:]
-                    if chunk_data.strip() == "[DONE]":
+                    if chunk_data.strip() == b"[DONE]":
                         break
 
                     try:
-                        chunk = json.loads(chunk_data)
+                        chunk = _json_loads(chunk_data)
 
                         # Check for error data from the client
                         if "error" in chunk:
@@ -360,7 +354,7 @@ async def convert_openai_streaming_to_claude_with_cancellation(
                                     "message": error_message
                                 }
                             }
-                            yield f"event: error\ndata: {json.dumps(error_event, ensure_ascii=False)}\n\n"
+                            yield _E_ERROR + _json_dumps(error_event) + b"\n\n"
                             return
 
                         choices = chunk.get("choices", [])
@@ -373,12 +367,14 @@ async def convert_openai_streaming_to_claude_with_cancellation(
                             # Update token counts when usage information is available
                             if "prompt_tokens" in usage and usage["prompt_tokens"] > 0:
                                 total_input_tokens = usage["prompt_tokens"]
-                                logger.debug(f"[Cancellation Stream] Updated input tokens: {total_input_tokens}")
+                                if logger.isEnabledFor(logging.DEBUG):
+                                    logger.debug("%s Updated input tokens: %d", stream_tag, total_input_tokens)
                             if "completion_tokens" in usage and usage["completion_tokens"] > 0:
                                 total_output_tokens = usage["completion_tokens"]
-                                logger.debug(f"[Cancellation Stream] Updated output tokens: {total_output_tokens}")
+                                if logger.isEnabledFor(logging.DEBUG):
+                                    logger.debug("%s Updated output tokens: %d", stream_tag, total_output_tokens)
 
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         logger.warning(
                             f"Failed to parse chunk: {chunk_data}, error: {e}"
                         )
@@ -390,7 +386,7 @@ async def convert_openai_streaming_to_claude_with_cancellation(
 
                     # Handle text delta
                     if "content" in delta and delta["content"]:
-                        yield f"event: {Constants.EVENT_CONTENT_BLOCK_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_DELTA, 'index': text_block_index, 'delta': {'type': Constants.DELTA_TEXT, 'text': delta['content']}}, ensure_ascii=False)}\n\n"
+                        yield _E_CBD + _json_dumps({'type': _EVT_CBD, 'index': text_block_index, 'delta': {'type': _DELTA_TEXT, 'text': delta['content']}}) + b"\n\n"
 
                     # Handle tool call deltas with improved incremental processing
                     if "tool_calls" in delta and delta["tool_calls"]:
@@ -399,66 +395,43 @@ async def convert_openai_streaming_to_claude_with_cancellation(
 
                             # Initialize tool call tracking by index if not exists
                             if tc_index not in current_tool_calls:
-                                current_tool_calls[tc_index] = {
-                                    "id": None,
-                                    "name": None,
-                                    "args_buffer": "",
-                                    "json_sent": False,
-                                    "claude_index": None,
-                                    "started": False
-                                }
+                                current_tool_calls[tc_index] = _ToolCallState()
 
                             tool_call = current_tool_calls[tc_index]
 
                             # Update tool call ID if provided
                             if tc_delta.get("id"):
-                                tool_call["id"] = tc_delta["id"]
+                                tool_call.id = tc_delta["id"]
 
                             # Update function name and start content block if we have both id and name
-                            function_data = tc_delta.get(Constants.TOOL_FUNCTION, {})
+                            function_data = tc_delta.get(_TOOL_FUNC, {})
                             if function_data.get("name"):
-                                tool_call["name"] = function_data["name"]
+                                tool_call.name = function_data["name"]
 
                             # Start content block when we have complete initial data
-                            if (tool_call["id"] and tool_call["name"] and not tool_call["started"]):
+                            if (tool_call.id and tool_call.name and not tool_call.started):
                                 tool_block_counter += 1
                                 claude_index = text_block_index + tool_block_counter
-                                tool_call["claude_index"] = claude_index
-                                tool_call["started"] = True
-
-                                yield f"event: {Constants.EVENT_CONTENT_BLOCK_START}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_START, 'index': claude_index, 'content_block': {'type': Constants.CONTENT_TOOL_USE, 'id': tool_call['id'], 'name': tool_call['name'], 'input': {}}}, ensure_ascii=False)}\n\n"
-
-                            # Handle function arguments
-                            if "arguments" in function_data and tool_call["started"] and function_data["arguments"] is not None:
-                                tool_call["args_buffer"] += function_data["arguments"]
-
-                                # Try to parse complete JSON and send delta when we have valid JSON
-                                try:
-                                    json.loads(tool_call["args_buffer"])
-                                    # If parsing succeeds and we haven't sent this JSON yet
-                                    if not tool_call["json_sent"]:
-                                        yield f"event: {Constants.EVENT_CONTENT_BLOCK_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_DELTA, 'index': tool_call['claude_index'], 'delta': {'type': Constants.DELTA_INPUT_JSON, 'partial_json': tool_call['args_buffer']}}, ensure_ascii=False)}\n\n"
-                                        tool_call["json_sent"] = True
-                                except json.JSONDecodeError:
-                                    # JSON is incomplete, continue accumulating
-                                    pass
+                                tool_call.claude_index = claude_index
+                                tool_call.started = True
+
+                                yield _E_CBS + _json_dumps({'type': _EVT_CBS, 'index': claude_index, 'content_block': {'type': _CONTENT_TOOL_USE, 'id': tool_call.id, 'name': tool_call.name, 'input': {}}}) + b"\n\n"
+
+                            # Forward argument fragments as they arrive
+                            if tool_call.started and function_data.get("arguments"):
+                                yield _E_CBD + _json_dumps({'type': _EVT_CBD, 'index': tool_call.claude_index, 'delta': {'type': _DELTA_INPUT_JSON, 'partial_json': function_data['arguments']}}) + b"\n\n"
 
                     # Handle finish reason
                     if finish_reason:
-                        if finish_reason == "length":
-                            final_stop_reason = Constants.STOP_MAX_TOKENS
-                        elif finish_reason in ["tool_calls", "function_call"]:
-                            final_stop_reason = Constants.STOP_TOOL_USE
-                        elif finish_reason == "stop":
-                            final_stop_reason = Constants.STOP_END_TURN
-                        else:
-                            final_stop_reason = Constants.STOP_END_TURN
+                        final_stop_reason = _FINISH_MAP.get(finish_reason, Constants.STOP_END_TURN)
                         break
 
-    except HTTPException as e:
-        # Handle cancellation
-        if e.status_code == 499:
-            logger.info(f"Request {request_id} was cancelled")
+    except Exception as e:
+        # Cancellation surfaces as a 499 from the client when cancellation is enabled
+        if cancellation is not None and isinstance(e, HTTPException):
+            if e.status_code != 499:
+                raise
+            logger.info("Request %s was cancelled", request_id)
             error_event = {
                 "type": "error",
                 "error": {
@@ -466,29 +439,26 @@ async def convert_openai_streaming_to_claude_with_cancellation(
                     "message": "Request was cancelled by client",
                 },
             }
-            yield f"event: error\ndata: {json.dumps(error_event, ensure_ascii=False)}\n\n"
+            yield _E_ERROR + _json_dumps(error_event) + b"\n\n"
             return
-        else:
-            raise
-    except Exception as e:
+
         # Handle any streaming errors gracefully
         logger.error(f"Streaming error: {e}")
-        import traceback
-
-        logger.error(traceback.format_exc())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.error(traceback.format_exc())
         error_event = {
             "type": "error",
             "error": {"type": "api_error", "message": f"Streaming error: {str(e)}"},
         }
-        yield f"event: error\ndata: {json.dumps(error_event, ensure_ascii=False)}\n\n"
+        yield _E_ERROR + _json_dumps(error_event) + b"\n\n"
         return
 
     # Send final SSE events
-    yield f"event: {Constants.EVENT_CONTENT_BLOCK_STOP}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': text_block_index}, ensure_ascii=False)}\n\n"
+    yield _E_CB_STOP + _json_dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': text_block_index}) + b"\n\n"
 
     for tool_data in current_tool_calls.values():
-        if tool_data.get("started") and tool_data.get("claude_index") is not None:
-            yield f"event: {Constants.EVENT_CONTENT_BLOCK_STOP}\ndata: {json.dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': tool_data['claude_index']}, ensure_ascii=False)}\n\n"
+        if tool_data.started and tool_data.claude_index is not None:
+            yield _E_CB_STOP + _json_dumps({'type': Constants.EVENT_CONTENT_BLOCK_STOP, 'index': tool_data.claude_index}) + b"\n\n"
 
     # Apply token estimation if enabled and usage data is incomplete
     if config.enable_token_estimation and total_input_tokens == 0 and total_output_tokens == 0:
@@ -506,14 +476,21 @@ async def convert_openai_streaming_to_claude_with_cancellation(
         total_input_tokens = estimated_input
         total_output_tokens = estimated_output
         
-        logger.info(f"📊 Using estimated tokens for streaming - Input: {total_input_tokens}, Output: {total_output_tokens} (conservative estimate)")
+        logger.info(
+            "📊 Using estimated tokens for streaming - Input: %d, Output: %d (conservative estimate)",
+            total_input_tokens, total_output_tokens,
+        )
 
     usage_data = {"input_tokens": total_input_tokens, "output_tokens": total_output_tokens}
-    logger.debug(f"[Cancellation Stream] Final usage data: {usage_data}")
+    logger.debug("%s Final usage data: %s", stream_tag, usage_data)
 
-    # Log token usage info to console for streaming with cancellation
+    # Log token usage info to console for streaming
     # Always log token usage for debugging, even if tokens are 0
-    logger.info(f"🎯 Token Usage [Stream+Cancel] | Model: {original_request.model} | Input: {total_input_tokens} | Output: {total_output_tokens} | Total: {total_input_tokens + total_output_tokens}")
-
-    yield f"event: {Constants.EVENT_MESSAGE_DELTA}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_DELTA, 'delta': {'stop_reason': final_stop_reason, 'stop_sequence': None}, 'usage': usage_data}, ensure_ascii=False)}\n\n"
-    yield f"event: {Constants.EVENT_MESSAGE_STOP}\ndata: {json.dumps({'type': Constants.EVENT_MESSAGE_STOP}, ensure_ascii=False)}\n\n"
+    logger.info(
+        "🎯 Token Usage %s | Model: %s | Input: %d | Output: %d | Total: %d",
+        stream_tag, original_request.model,
+        total_input_tokens, total_output_tokens, total_input_tokens + total_output_tokens,
+    )
+
+    yield _E_MSG_DELTA + _json_dumps({'type': Constants.EVENT_MESSAGE_DELTA, 'delta': {'stop_reason': final_stop_reason, 'stop_sequence': None}, 'usage': usage_data}) + b"\n\n"
+    yield _MESSAGE_STOP_FRAME
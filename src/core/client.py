@@ -1,11 +1,84 @@
 import asyncio
-import json
+import re
+import weakref
+import httpx
+import orjson
 from fastapi import HTTPException
-from typing import Optional, AsyncGenerator, Dict, Any
-from openai import AsyncOpenAI, AsyncAzureOpenAI
+from typing import Optional, AsyncGenerator, AsyncIterator, Dict, Any
+from openai import AsyncOpenAI, AsyncAzureOpenAI, DefaultAsyncHttpxClient
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from openai._exceptions import APIError, RateLimitError, AuthenticationError, BadRequestError
 
+
+def _sse_data(obj: Any) -> bytes:
+    """Encode a payload as a complete SSE data frame; orjson emits UTF-8 bytes directly."""
+    return b"data: " + orjson.dumps(obj) + b"\n\n"
+
+
+# Fixed frames, rendered once at import
+_DONE_FRAME = b"data: [DONE]\n\n"
+_CANCEL_FRAME = _sse_data({"error": {"type": "client_error", "message": "Request cancelled by client"}})
+_TIMEOUT_FRAME_TEMPLATE = _sse_data(
+    {"error": {"type": "timeout_error", "message": "Timeout waiting for streaming chunk after %d chunks"}}
+)
+
+# Seconds a streaming read may wait for the next upstream line
+_STREAM_IDLE_TIMEOUT = 30.0
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+    """Split a raw byte stream into lines without decoding it."""
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+# One connection pool for every upstream call so keep-alive sockets are reused.
+# With HTTP/2 many streams share one socket, so every pooled connection may stay alive.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=120)
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_clients: Dict[tuple, "OpenAIClient"] = {}
+
+
+def _get_http_client(timeout: int) -> httpx.AsyncClient:
+    """Return the process-wide httpx client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # The SDK's default client class keeps its defaults, notably follow_redirects=True
+        _http_client = DefaultAsyncHttpxClient(limits=_HTTP_LIMITS, timeout=timeout, http2=True)
+    return _http_client
+
+
+def get_openai_client(api_key: str, base_url: str, timeout: int = 90, api_version: Optional[str] = None) -> "OpenAIClient":
+    """Return a shared OpenAIClient for the given endpoint, creating it on first use."""
+    key = (api_key, base_url, api_version)
+    client = _openai_clients.get(key)
+    if client is None:
+        client = _openai_clients[key] = OpenAIClient(api_key, base_url, timeout, api_version=api_version)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared connection pool; called on application shutdown.
+
+    OpenAIClient instances notice the closed pool and rebind to a new one on next use.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Matches a chunk whose finish_reason is set to a string rather than null
+_FINISH_REASON_RE = re.compile(rb'"finish_reason"\s*:\s*"')
+_FINISH_REASONS = frozenset({'stop', 'length', 'function_call', 'tool_calls', 'content_filter'})
+
+
 class OpenAIClient:
     """Async OpenAI client with cancellation support."""
     
@@ -13,8 +86,10 @@ class OpenAIClient:
         self.api_key = api_key
         self.base_url = base_url
         self.api_version = api_version  # Store API version for later use
+        self.timeout = timeout
         
-        # Detect if using Azure and instantiate the appropriate client
+        # Detect if using Azure and work out the endpoint the Azure client needs
+        self.azure_endpoint: Optional[str] = None
         if api_version:
             # For Azure OpenAI, we need to ensure we have the correct endpoint format
             azure_endpoint = base_url
@@ -24,65 +99,69 @@ class OpenAIClient:
                 azure_endpoint = azure_endpoint.split('/openai')[0]
             
             # Remove any trailing slashes
-            azure_endpoint = azure_endpoint.rstrip('/')
-            
-            print(f"Using Azure OpenAI endpoint: {azure_endpoint} with API version: {api_version}")
+            self.azure_endpoint = azure_endpoint.rstrip('/')
             
+            print(f"Using Azure OpenAI endpoint: {self.azure_endpoint} with API version: {api_version}")
+        
+        # The SDK client is built on first use and rebuilt whenever the shared pool is replaced
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # Weak values: an entry disappears with its future even if a finally block never runs.
+        # All access is synchronous on the event loop thread, so no lock is needed.
+        self.active_requests: "weakref.WeakValueDictionary[str, asyncio.Future]" = weakref.WeakValueDictionary()
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The SDK client bound to the current shared pool.
+
+        close_http_client() closes the pool on shutdown; a later lifespan in the
+        same process gets a fresh pool, and the SDK client is rebuilt around it.
+        """
+        http_client = _get_http_client(self.timeout)
+        client = self._client
+        if client is None or http_client is not self._http_client:
+            self._http_client = http_client
+            client = self._client = self._build_client(http_client)
+        return client
+    
+    def _build_client(self, http_client: httpx.AsyncClient) -> AsyncOpenAI:
+        if self.azure_endpoint is not None:
             # Configure Azure OpenAI client with specific timeout and retry settings
-            self.client = AsyncAzureOpenAI(
-                api_key=api_key,
-                azure_endpoint=azure_endpoint,
-                api_version=api_version,
-                timeout=timeout,
-                max_retries=3  # Add max retries for better reliability
+            return AsyncAzureOpenAI(
+                api_key=self.api_key,
+                azure_endpoint=self.azure_endpoint,
+                api_version=self.api_version,
+                timeout=self.timeout,
+                max_retries=3,  # Add max retries for better reliability
+                http_client=http_client,
             )
-        else:
-            self.client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=base_url,
-                timeout=timeout,
-                max_retries=3
-            )
-        self.active_requests: Dict[str, asyncio.Event] = {}
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=3,
+            http_client=http_client,
+        )
     
     async def create_chat_completion(self, request: Dict[str, Any], request_id: Optional[str] = None) -> Dict[str, Any]:
         """Send chat completion to OpenAI API with cancellation support."""
         
-        # Create cancellation token if request_id provided
-        if request_id:
-            cancel_event = asyncio.Event()
-            self.active_requests[request_id] = cancel_event
-        
         try:
-            # Create task that can be cancelled
-            completion_task = asyncio.create_task(
-                self.client.chat.completions.create(**request)
-            )
-            
             if request_id:
-                # Wait for either completion or cancellation
-                cancel_task = asyncio.create_task(cancel_event.wait())
-                done, pending = await asyncio.wait(
-                    [completion_task, cancel_task],
-                    return_when=asyncio.FIRST_COMPLETED
+                # Track the completion task itself so cancel_request can cancel it directly
+                completion_task = asyncio.create_task(
+                    self.client.chat.completions.create(**request)
                 )
-                
-                # Cancel pending tasks
-                for task in pending:
-                    task.cancel()
-                    try:
-                        await task
-                    except asyncio.CancelledError:
-                        pass
-                
-                # Check if request was cancelled
-                if cancel_task in done:
-                    completion_task.cancel()
+                self.active_requests[request_id] = completion_task
+                try:
+                    completion = await completion_task
+                except asyncio.CancelledError:
+                    # cancel_request pops the entry; anything else is our own cancellation
+                    if request_id in self.active_requests:
+                        raise
                     raise HTTPException(status_code=499, detail="Request cancelled by client")
-                
-                completion = await completion_task
             else:
-                completion = await completion_task
+                completion = await self.client.chat.completions.create(**request)
             
             # Convert to dict format that matches the original interface
             return completion.model_dump()
@@ -96,23 +175,32 @@ class OpenAIClient:
         except APIError as e:
             status_code = getattr(e, 'status_code', 500)
             raise HTTPException(status_code=status_code, detail=self.classify_openai_error(str(e)))
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
         
         finally:
             # Clean up active request tracking
-            if request_id and request_id in self.active_requests:
-                del self.active_requests[request_id]
+            if request_id:
+                self.active_requests.pop(request_id, None)
     
-    async def create_chat_completion_stream(self, request: Dict[str, Any], request_id: Optional[str] = None) -> AsyncGenerator[str, None]:
-        """Send streaming chat completion to OpenAI API with cancellation support."""
+    async def create_chat_completion_stream(self, request: Dict[str, Any], request_id: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        """Send streaming chat completion to OpenAI API with cancellation support.
+
+        Upstream SSE ``data:`` lines are forwarded verbatim instead of being
+        parsed into ChatCompletionChunk models and serialized again.
+        """
         
         # Create cancellation token if request_id provided
+        cancel_future: Optional[asyncio.Future] = None
         if request_id:
-            cancel_event = asyncio.Event()
-            self.active_requests[request_id] = cancel_event
+            cancel_future = asyncio.get_running_loop().create_future()
+            self.active_requests[request_id] = cancel_future
         
-        streaming_completion = None
+        streaming_response = None
+        next_line: Optional[asyncio.Future] = None
+        watchdog: Optional[asyncio.TimerHandle] = None
         
         try:
             # Ensure stream is enabled
@@ -121,96 +209,147 @@ class OpenAIClient:
             # Log the request for debugging
             import logging
             logger = logging.getLogger(__name__)
-            logger.debug(f"Creating streaming completion with request: {json.dumps({k: v for k, v in request.items() if k != 'messages'}, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Creating streaming completion with request: %s",
+                    orjson.dumps({k: v for k, v in request.items() if k != 'messages'}, option=orjson.OPT_INDENT_2).decode(),
+                )
             
-            # Create the streaming completion with simpler error handling
+            # Open the raw streaming response with simpler error handling
             try:
-                streaming_completion = await self.client.chat.completions.create(**request)
+                streaming_response = self.client.chat.completions.with_streaming_response.create(**request)
+                response = await streaming_response.__aenter__()
                 logger.debug("Streaming completion created successfully")
             except Exception as e:
-                logger.error(f"Failed to create streaming completion: {e}")
+                streaming_response = None
+                logger.error("Failed to create streaming completion: %s", e)
                 error_data = {
                     "error": {
                         "type": "connection_error",
                         "message": f"Failed to start streaming: {str(e)}"
                     }
                 }
-                yield f"data: {json.dumps(error_data)}"
+                yield _sse_data(error_data)
                 return
             
             # Handle the async iteration with explicit iterator handling for Azure compatibility
             chunk_count = 0
             logger.debug("Starting to iterate over streaming chunks")
             
-            # Use explicit async iterator to handle Azure OpenAI streaming properly
-            stream_iterator = streaming_completion.__aiter__()
+            # Use explicit async iterator so each read can be raced against cancellation
+            line_iterator = _iter_lines(response.iter_bytes()).__aiter__()
             stream_finished = False
             
+            # One re-arming idle timer instead of a timeout handle per chunk
+            loop = asyncio.get_running_loop()
+            reader_task: Optional[asyncio.Task] = None
+            idle_timeout = _STREAM_IDLE_TIMEOUT
+            read_started_at = loop.time()
+            reading = False
+            timed_out = False
+            
+            def _idle_check() -> None:
+                nonlocal watchdog, timed_out
+                now = loop.time()
+                if reading and now >= read_started_at + idle_timeout:
+                    timed_out = True
+                    # Cancel the pending read: the racing future, or the task reading directly
+                    pending = next_line if next_line is not None else reader_task
+                    if pending is not None:
+                        pending.cancel()
+                else:
+                    deadline = read_started_at + idle_timeout if reading else now + idle_timeout
+                    watchdog = loop.call_at(deadline, _idle_check)
+            
+            watchdog = loop.call_at(read_started_at + idle_timeout, _idle_check)
+            
             while not stream_finished:
                 try:
-                    # Get next chunk with timeout
-                    chunk = await asyncio.wait_for(stream_iterator.__anext__(), timeout=30.0)
+                    read_started_at = loop.time()
+                    reading = True
+                    if cancel_future is None:
+                        # Nothing to race against, so read directly without a task per line
+                        reader_task = asyncio.current_task()
+                        try:
+                            line = await line_iterator.__anext__()
+                        except asyncio.CancelledError:
+                            if not timed_out:
+                                raise
+                            # Python 3.11+ counts cancellations; drop the one the watchdog made
+                            uncancel = getattr(reader_task, "uncancel", None)
+                            if uncancel is not None:
+                                uncancel()
+                            raise asyncio.TimeoutError from None
+                        finally:
+                            reading = False
+                    else:
+                        # Race the next line against cancellation so the loop needs no per-chunk check
+                        next_line = asyncio.ensure_future(line_iterator.__anext__())
+                        done, _ = await asyncio.wait(
+                            {next_line, cancel_future}, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        reading = False
+                        if next_line.cancelled() and timed_out:
+                            raise asyncio.TimeoutError
+                        if next_line not in done:
+                            next_line.cancel()
+                            logger.info("Request %s cancelled by client", request_id)
+                            yield _CANCEL_FRAME
+                            return
+                        line = next_line.result()
+                    
+                    # Only data lines carry chunks; skip blanks, comments and event names
+                    if not line.startswith(b"data:"):
+                        continue
+                    chunk_json = line[5:].strip()
+                    if chunk_json == b"[DONE]":
+                        logger.debug("Stream ended via [DONE]")
+                        break
+                    
                     chunk_count += 1
-                    logger.debug(f"Processing chunk {chunk_count}")
+                    logger.debug("Processing chunk %d", chunk_count)
                     
-                    # Quick cancellation check
-                    if request_id and request_id in self.active_requests and self.active_requests[request_id].is_set():
-                        logger.info(f"Request {request_id} cancelled by client")
-                        error_data = {
-                            "error": {
-                                "type": "client_error",
-                                "message": "Request cancelled by client"
-                            }
-                        }
-                        yield f"data: {json.dumps(error_data)}"
-                        return
+                    # Yield the upstream chunk as is
+                    logger.debug("Yielding chunk %d: %d bytes", chunk_count, len(chunk_json))
+                    yield b"data: " + chunk_json + b"\n\n"
                     
-                    # Process and yield chunk immediately
-                    try:
-                        chunk_dict = chunk.model_dump()
-                        chunk_json = json.dumps(chunk_dict, ensure_ascii=False)
-                        logger.debug(f"Yielding chunk {chunk_count}: {len(chunk_json)} characters")
-                        yield f"data: {chunk_json}"
+                    # Most chunks carry "finish_reason": null, only parse the one with a value
+                    if _FINISH_REASON_RE.search(chunk_json):
+                        try:
+                            chunk_dict = orjson.loads(chunk_json)
+                        except orjson.JSONDecodeError as chunk_error:
+                            logger.warning("Error processing chunk %d: %s", chunk_count, chunk_error)
+                            continue
                         
                         # Check if this chunk indicates the end of the stream
                         if chunk_dict.get('choices') and len(chunk_dict['choices']) > 0:
                             choice = chunk_dict['choices'][0]
-                            if choice.get('finish_reason') in ['stop', 'length', 'function_call', 'tool_calls', 'content_filter']:
-                                logger.debug(f"Stream finished with reason: {choice.get('finish_reason')}")
+                            if choice.get('finish_reason') in _FINISH_REASONS:
+                                logger.debug("Stream finished with reason: %s", choice.get('finish_reason'))
                                 stream_finished = True
                                 break
-                                
-                    except Exception as chunk_error:
-                        logger.warning(f"Error processing chunk {chunk_count}: {chunk_error}")
-                        continue
                         
                 except StopAsyncIteration:
                     logger.debug("Stream ended normally via StopAsyncIteration")
                     stream_finished = True
                     break
                 except asyncio.TimeoutError:
-                    logger.error(f"Timeout waiting for chunk {chunk_count + 1}")
-                    error_data = {
-                        "error": {
-                            "type": "timeout_error",
-                            "message": f"Timeout waiting for streaming chunk after {chunk_count} chunks"
-                        }
-                    }
-                    yield f"data: {json.dumps(error_data)}"
+                    logger.error("Timeout waiting for chunk %d", chunk_count + 1)
+                    yield _TIMEOUT_FRAME_TEMPLATE % chunk_count
                     return
                 except Exception as stream_error:
-                    logger.error(f"Error during streaming iteration: {stream_error}")
+                    logger.error("Error during streaming iteration: %s", stream_error)
                     error_data = {
                         "error": {
                             "type": "stream_error",
                             "message": f"Streaming error: {str(stream_error)}"
                         }
                     }
-                    yield f"data: {json.dumps(error_data)}"
+                    yield _sse_data(error_data)
                     return
             
-            logger.debug(f"Streaming completed after {chunk_count} chunks")
-            yield "data: [DONE]"
+            logger.debug("Streaming completed after %d chunks", chunk_count)
+            yield _DONE_FRAME
                 
         except (AuthenticationError, RateLimitError, BadRequestError, APIError) as e:
             # For streaming responses, we need to yield error data instead of raising HTTPException
@@ -230,12 +369,12 @@ class OpenAIClient:
                     "message": error_detail
                 }
             }
-            yield f"data: {json.dumps(error_data)}"
+            yield _sse_data(error_data)
             return
             
         except Exception as e:
             # For unexpected errors in streaming, also yield error data
-            logger.error(f"Unexpected streaming error: {e}")
+            logger.error("Unexpected streaming error: %s", e)
             error_data = {
                 "error": {
                     "type": "internal_error", 
@@ -243,114 +382,22 @@ class OpenAIClient:
                     "message": f"Unexpected error: {str(e)}"
                 }
             }
-            yield f"data: {json.dumps(error_data)}"
+            yield _sse_data(error_data)
             return
         
         finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            # Stop a pending read if the consumer went away mid-wait
+            if next_line is not None and not next_line.done():
+                next_line.cancel()
+            # Release the upstream connection
+            if streaming_response is not None:
+                await streaming_response.__aexit__(None, None, None)
             # Clean up active request tracking
-            if request_id and request_id in self.active_requests:
-                del self.active_requests[request_id]
+            if request_id:
+                self.active_requests.pop(request_id, None)
 
-    async def _handle_azure_streaming_alternative(self, request: Dict[str, Any], request_id: Optional[str] = None) -> AsyncGenerator[str, None]:
-        """Alternative streaming implementation for Azure OpenAI when regular streaming fails."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        try:
-            # Use a shorter timeout for Azure streaming
-            logger.debug("Trying alternative Azure streaming approach")
-            
-            # Create the streaming completion with explicit timeout handling
-            stream_task = asyncio.create_task(
-                self.client.chat.completions.create(**request)
-            )
-            
-            try:
-                streaming_completion = await asyncio.wait_for(stream_task, timeout=10.0)
-            except asyncio.TimeoutError:
-                logger.error("Azure streaming creation timed out")
-                stream_task.cancel()
-                error_data = {
-                    "error": {
-                        "type": "timeout_error",
-                        "message": "Azure streaming creation timed out"
-                    }
-                }
-                yield f"data: {json.dumps(error_data)}"
-                return
-            
-            chunk_count = 0
-            last_chunk_time = asyncio.get_event_loop().time()
-            
-            # Iterate through chunks with timeout protection
-            while True:
-                try:
-                    # Wait for next chunk with timeout
-                    chunk = await asyncio.wait_for(streaming_completion.__anext__(), timeout=30.0)
-                    
-                    chunk_count += 1
-                    current_time = asyncio.get_event_loop().time()
-                    logger.debug(f"Received chunk {chunk_count} after {current_time - last_chunk_time:.2f}s")
-                    last_chunk_time = current_time
-                    
-                    # Check for cancellation
-                    if request_id and request_id in self.active_requests:
-                        if self.active_requests[request_id].is_set():
-                            logger.info(f"Request {request_id} cancelled")
-                            error_data = {
-                                "error": {
-                                    "type": "client_error",
-                                    "message": "Request cancelled by client"
-                                }
-                            }
-                            yield f"data: {json.dumps(error_data)}"
-                            return
-                    
-                    # Process chunk
-                    try:
-                        chunk_dict = chunk.model_dump()
-                        chunk_json = json.dumps(chunk_dict, ensure_ascii=False)
-                        yield f"data: {chunk_json}"
-                    except Exception as chunk_error:
-                        logger.warning(f"Error processing chunk {chunk_count}: {chunk_error}")
-                        continue
-                        
-                except StopAsyncIteration:
-                    logger.debug(f"Streaming completed normally after {chunk_count} chunks")
-                    break
-                except asyncio.TimeoutError:
-                    logger.error(f"Timeout waiting for chunk after {chunk_count} chunks")
-                    error_data = {
-                        "error": {
-                            "type": "timeout_error",
-                            "message": f"Timeout waiting for streaming chunk after {chunk_count} chunks"
-                        }
-                    }
-                    yield f"data: {json.dumps(error_data)}"
-                    return
-                except Exception as chunk_error:
-                    logger.error(f"Error getting chunk {chunk_count + 1}: {chunk_error}")
-                    error_data = {
-                        "error": {
-                            "type": "stream_error",
-                            "message": f"Error reading stream: {str(chunk_error)}"
-                        }
-                    }
-                    yield f"data: {json.dumps(error_data)}"
-                    return
-            
-            yield "data: [DONE]"
-            
-        except Exception as e:
-            logger.error(f"Alternative streaming failed: {e}")
-            error_data = {
-                "error": {
-                    "type": "stream_error",
-                    "message": f"Alternative streaming failed: {str(e)}"
-                }
-            }
-            yield f"data: {json.dumps(error_data)}"
-    
     def classify_openai_error(self, error_detail: Any) -> str:
         """Provide specific error guidance for common OpenAI API issues."""
         error_str = str(error_detail).lower()
@@ -388,7 +435,8 @@ class OpenAIClient:
     
     def cancel_request(self, request_id: str) -> bool:
         """Cancel an active request by request_id."""
-        if request_id in self.active_requests:
-            self.active_requests[request_id].set()
-            return True
-        return False
\ No newline at end of file
+        pending = self.active_requests.pop(request_id, None)
+        if pending is None:
+            return False
+        pending.cancel()
+        return True
\ No newline at end of file
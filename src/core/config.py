@@ -1,47 +1,76 @@
+import logging
 import os
 import sys
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 # Configuration
+@dataclass(frozen=True)
 class Config:
-    def __init__(self):
-        self.openai_api_key = os.environ.get("OPENAI_API_KEY")
+    openai_api_key: str = field(repr=False)  # keep the key out of reprs and logs
+    openai_base_url: str
+    azure_api_version: Optional[str]  # For Azure OpenAI
+    host: str
+    port: int
+    workers: int
+    log_level: str
+    access_log: bool
+    max_tokens_limit: int
+    min_tokens_limit: int
+    default_max_tokens: int  # Default max_tokens for downstream requests
+    request_timeout: int
+    max_retries: int
+    big_model: str
+    small_model: str
+    enable_token_estimation: bool
+
+    def __post_init__(self) -> None:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-        self.openai_base_url = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        self.azure_api_version = os.environ.get("AZURE_API_VERSION")  # For Azure OpenAI
+    @classmethod
+    def from_env(cls) -> "Config":
+        """Read the configuration from environment variables."""
+        openai_base_url = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        azure_api_version = os.environ.get("AZURE_API_VERSION")
 
         # Special handling for Azure OpenAI
-        if self.azure_api_version:
+        if azure_api_version:
             # If using Azure, ensure the base URL is properly formatted
-            if '/openai/deployments/' in self.openai_base_url:
+            if '/openai/deployments/' in openai_base_url:
                 # Extract the base endpoint from full deployment URL
                 # e.g., https://roy-key-us-east-2.openai.azure.com/openai/deployments/gpt-4.1/chat/completions
                 # becomes https://roy-key-us-east-2.openai.azure.com
-                parts = self.openai_base_url.split('/openai/')
+                parts = openai_base_url.split('/openai/')
                 if len(parts) > 1:
-                    self.openai_base_url = parts[0]
-                    print(f"Detected Azure OpenAI deployment URL, extracted endpoint: {self.openai_base_url}")
-
-        self.host = os.environ.get("HOST", "0.0.0.0")
-        self.port = int(os.environ.get("PORT", "8082"))
-        self.log_level = os.environ.get("LOG_LEVEL", "INFO")
-        self.max_tokens_limit = int(os.environ.get("MAX_TOKENS_LIMIT", "4096"))
-        self.min_tokens_limit = int(os.environ.get("MIN_TOKENS_LIMIT", "100"))
+                    openai_base_url = parts[0]
+                    logger.warning("Detected Azure OpenAI deployment URL, extracted endpoint: %s", openai_base_url)
 
-        # Default max_tokens for downstream requests
-        self.default_max_tokens = int(os.environ.get("DEFAULT_MAX_TOKENS", "1024"))
-
-        # Connection settings
-        self.request_timeout = int(os.environ.get("REQUEST_TIMEOUT", "90"))
-        self.max_retries = int(os.environ.get("MAX_RETRIES", "2"))
-
-        # Model settings - BIG and SMALL models
-        self.big_model = os.environ.get("BIG_MODEL", "gpt-4o")
-        self.small_model = os.environ.get("SMALL_MODEL", "gpt-4o-mini")
-        
-        # Token estimation settings
-        self.enable_token_estimation = os.environ.get("ENABLE_TOKEN_ESTIMATION", "true").lower() == "true"
+        return cls(
+            openai_api_key=os.environ.get("OPENAI_API_KEY", ""),
+            openai_base_url=openai_base_url,
+            azure_api_version=azure_api_version,
+            host=os.environ.get("HOST", "0.0.0.0"),
+            port=int(os.environ.get("PORT", "8082")),
+            workers=int(os.environ.get("WORKERS", str(min(os.cpu_count() or 1, 4)))),
+            log_level=os.environ.get("LOG_LEVEL", "INFO"),
+            # Per-request uvicorn access lines are off unless explicitly requested
+            access_log=os.environ.get("ACCESS_LOG", "false").lower() in ("1", "true"),
+            max_tokens_limit=int(os.environ.get("MAX_TOKENS_LIMIT", "4096")),
+            min_tokens_limit=int(os.environ.get("MIN_TOKENS_LIMIT", "100")),
+            default_max_tokens=int(os.environ.get("DEFAULT_MAX_TOKENS", "1024")),
+            # Connection settings
+            request_timeout=int(os.environ.get("REQUEST_TIMEOUT", "90")),
+            max_retries=int(os.environ.get("MAX_RETRIES", "2")),
+            # Model settings - BIG and SMALL models
+            big_model=os.environ.get("BIG_MODEL", "gpt-4o"),
+            small_model=os.environ.get("SMALL_MODEL", "gpt-4o-mini"),
+            # Token estimation settings
+            enable_token_estimation=os.environ.get("ENABLE_TOKEN_ESTIMATION", "true").lower() == "true",
+        )
 
     def validate_api_key(self):
         """Basic API key validation"""
@@ -52,9 +81,15 @@ class Config:
             return False
         return True
 
+@cache
+def get_config() -> Config:
+    """Load the configuration once per process."""
+    return Config.from_env()
+
 try:
-    config = Config()
-    print(f" Configuration loaded: API_KEY={'*' * 20}..., BASE_URL='{config.openai_base_url}'")
+    config = get_config()
+    # Logging is configured from this config, so the handlers do not exist yet; print the banner
+    print(f"Configuration loaded: API_KEY={'*' * 20}..., BASE_URL='{config.openai_base_url}'")
 except Exception as e:
-    print(f"=4 Configuration Error: {e}")
+    logger.error("Configuration Error: %s", e)
     sys.exit(1)
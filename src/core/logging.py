@@ -1,12 +1,17 @@
 import logging
 from src.core.config import config
 
+# Shared log layout; an explicit datefmt drops the ",mmm" millisecond suffix but keeps the date
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
 def setup_logging():
     """Setup logging configuration."""
     # Logging Configuration
     logging.basicConfig(
         level=getattr(logging, config.log_level.upper()),
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=LOG_FORMAT,
+        datefmt=LOG_DATEFMT,
     )
     
     # Configure uvicorn to be quieter
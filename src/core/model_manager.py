@@ -1,8 +1,11 @@
+from functools import lru_cache
 from src.core.config import config
 
 class ModelManager:
     def __init__(self, config):
         self.config = config
+        # Model names are low-cardinality and config is immutable, so cache every mapping
+        self.map_claude_model_to_openai = lru_cache(maxsize=32)(self.map_claude_model_to_openai)
     
     def map_claude_model_to_openai(self, claude_model: str) -> str:
         """Map Claude model names to OpenAI model names based on BIG/SMALL pattern"""
@@ -4,9 +4,11 @@ Token estimation utilities for when downstream APIs don't provide accurate usage
 This module provides rough token count estimation based on text analysis.
 """
 
-import re
 from typing import List, Dict, Any
-from src.models.claude import ClaudeMessagesRequest
+from src.models.claude import ClaudeMessage, ClaudeMessagesRequest
+
+# UTF-8 首字节 0xE4-0xE9 对应 U+4000-U+9FFF，每个字符只有一个首字节
+_CJK_LEAD_BYTES = bytes(range(0xE4, 0xEA))
 
 
 class TokenEstimator:
@@ -35,16 +37,16 @@ class TokenEstimator:
         if isinstance(text, str):
             text_content = text
         elif isinstance(text, list):
-            # 如果是列表，提取所有text内容
-            text_content = ""
+            # 如果是列表，提取所有text内容后一次性拼接
+            parts = []
             for item in text:
                 if isinstance(item, dict) and 'text' in item:
-                    text_content += item['text'] + " "
+                    parts.append(item['text'])
                 elif hasattr(item, 'text'):
-                    text_content += item.text + " "
+                    parts.append(item.text)
                 elif isinstance(item, str):
-                    text_content += item + " "
-            text_content = text_content.strip()
+                    parts.append(item)
+            text_content = " ".join(parts).strip()
         else:
             # 尝试获取text属性
             if hasattr(text, 'text'):
@@ -54,9 +56,14 @@ class TokenEstimator:
         
         if not text_content:
             return 0
-            
-        # 分析文本的中英文比例
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text_content))
+        
+        return self._count_text_tokens(text_content)
+    
+    def _count_text_tokens(self, text_content: str) -> int:
+        """按中英文比例估算单段文本的token数量"""
+        # 分析文本的中英文比例：统计UTF-8中汉字首字节的数量，避免逐字符正则匹配
+        data = text_content.encode('utf-8', 'surrogatepass')
+        chinese_chars = len(data) - len(data.translate(None, _CJK_LEAD_BYTES))
         total_chars = len(text_content)
         
         if total_chars == 0:
@@ -74,12 +81,12 @@ class TokenEstimator:
             
         return max(1, int(estimated_tokens))  # 至少1个token
     
-    def estimate_messages_tokens(self, messages: List[Dict[str, Any]]) -> int:
+    def estimate_messages_tokens(self, messages: List[ClaudeMessage]) -> int:
         """
         估算消息列表的token数量
         
         Args:
-            messages: 消息列表
+            messages: Claude消息模型列表
             
         Returns:
             估算的总token数量
@@ -88,21 +95,11 @@ class TokenEstimator:
         
         for message in messages:
             # 估算role字段的token (通常很少)
-            if 'role' in message:
-                total_tokens += 1  # role字段大约1个token
+            total_tokens += 1  # role字段大约1个token
                 
             # 估算content字段的token
-            if 'content' in message:
-                content = message['content']
-                if isinstance(content, str):
-                    total_tokens += self.estimate_text_tokens(content)
-                elif isinstance(content, list):
-                    # Claude format中content可能是数组
-                    for item in content:
-                        if isinstance(item, dict) and 'text' in item:
-                            total_tokens += self.estimate_text_tokens(item['text'])
-                        elif isinstance(item, str):
-                            total_tokens += self.estimate_text_tokens(item)
+            # Claude format中content可能是数组，数组中的文本块合并后只扫描一次
+            total_tokens += self.estimate_text_tokens(message.content)
         
         # 加上一些额外的开销token（消息格式、分隔符等）
         overhead_tokens = len(messages) * 3  # 每条消息大约3个额外token
@@ -124,8 +121,7 @@ class TokenEstimator:
         
         # 估算messages的token
         if hasattr(request, 'messages') and request.messages:
-            messages_dict = [msg.dict() if hasattr(msg, 'dict') else msg for msg in request.messages]
-            total_tokens += self.estimate_messages_tokens(messages_dict)
+            total_tokens += self.estimate_messages_tokens(request.messages)
         
         # 估算system prompt的token
         if hasattr(request, 'system') and request.system:
@@ -154,8 +150,12 @@ token_estimator = TokenEstimator()
 
 
 def estimate_input_tokens(request: ClaudeMessagesRequest) -> int:
-    """估算输入token数量的便捷函数"""
-    return token_estimator.estimate_request_input_tokens(request)
+    """估算输入token数量的便捷函数，同一个请求对象只估算一次"""
+    cached = getattr(request, "_input_token_estimate", None)
+    if cached is None:
+        cached = token_estimator.estimate_request_input_tokens(request)
+        request._input_token_estimate = cached
+    return cached
 
 
 def estimate_output_tokens(text: str) -> int:
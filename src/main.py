@@ -1,29 +1,51 @@
+import argparse
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from src.api.endpoints import router as api_router
 import uvicorn
 import sys
 import logging
+import traceback
+import orjson
 from src.core.config import config
+from src.core.client import close_http_client
+from src.core.logging import LOG_FORMAT, LOG_DATEFMT
 
 # Setup basic logging
 logging.basicConfig(
     level=getattr(logging, config.log_level.upper()),
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
+    datefmt=LOG_DATEFMT,
     force=True,  # 强制重新配置日志
 )
 # 确保立即刷新日志输出
 logging.getLogger().handlers[0].setLevel(getattr(logging, config.log_level.upper()))
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Claude-to-OpenAI API Proxy", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled upstream connections on shutdown
+    await close_http_client()
+
+
+app = FastAPI(
+    title="Claude-to-OpenAI API Proxy",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# Compress larger non-streaming replies; Starlette >= 0.46 never compresses text/event-stream
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Global exception handler for HTTPExceptions
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTPExceptions with proper error response format."""
     logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -34,55 +56,84 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         }
     )
 
+# The 500 body never varies, so serialize it once
+_INTERNAL_ERROR_BODY = orjson.dumps(
+    {
+        "error": {
+            "type": "internal_error",
+            "status_code": 500,
+            "message": "Internal server error occurred"
+        }
+    }
+)
+
 # Global exception handler for unhandled exceptions
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other unhandled exceptions."""
-    logger.error(f"Unhandled exception: {type(exc).__name__}: {str(exc)}")
-    import traceback
-    logger.error(traceback.format_exc())
+    logger.error("Unhandled exception: %s: %s", type(exc).__name__, exc)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.error(traceback.format_exc())
 
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": {
-                "type": "internal_error",
-                "status_code": 500,
-                "message": "Internal server error occurred"
-            }
-        }
-    )
+    return Response(content=_INTERNAL_ERROR_BODY, status_code=500, media_type="application/json")
 
 app.include_router(api_router)
 
 
+_HELP_EPILOG = "\n".join(
+    [
+        "Required environment variables:",
+        "  OPENAI_API_KEY - Your OpenAI API key",
+        "",
+        "Optional environment variables:",
+        "  OPENAI_BASE_URL - OpenAI API base URL (default: https://api.openai.com/v1)",
+        "  BIG_MODEL - Model for sonnet/opus requests (default: gpt-4o)",
+        "  SMALL_MODEL - Model for haiku requests (default: gpt-4o-mini)",
+        "  HOST - Server host (default: 0.0.0.0)",
+        "  PORT - Server port (default: 8082)",
+        "  WORKERS - Number of worker processes (default: CPU count, at most 4)",
+        "  LOG_LEVEL - Logging level (default: WARNING)",
+        "  ACCESS_LOG - Enable per-request access logging (default: false)",
+        "  MAX_TOKENS_LIMIT - Token limit (default: 4096)",
+        "  MIN_TOKENS_LIMIT - Minimum token limit (default: 100)",
+        "  DEFAULT_MAX_TOKENS - Default max_tokens for requests (default: 1024)",
+        "  REQUEST_TIMEOUT - Request timeout in seconds (default: 90)",
+        "",
+        "Model mapping:",
+        f"  Claude haiku models -> {config.small_model}",
+        f"  Claude sonnet/opus models -> {config.big_model}",
+    ]
+)
+
+
+# Only watch the package sources; uvicorn warns if these are passed without reload
+_RELOAD_OPTIONS = {
+    "reload_dirs": ["src"],
+    "reload_includes": ["*.py"],
+    "reload_excludes": ["tests/*", "*.md"],
+}
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Claude-to-OpenAI API Proxy v1.0.0",
+        epilog=_HELP_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="reload on source changes (single worker, for development only)",
+    )
+    return parser
+
+
 def main():
-    if len(sys.argv) > 1 and sys.argv[1] == "--help":
-        print("Claude-to-OpenAI API Proxy v1.0.0")
-        print("")
-        print("Usage: python src/main.py")
-        print("")
-        print("Required environment variables:")
-        print("  OPENAI_API_KEY - Your OpenAI API key")
-        print("")
-        print("Optional environment variables:")
-        print(
-            f"  OPENAI_BASE_URL - OpenAI API base URL (default: https://api.openai.com/v1)"
-        )
-        print(f"  BIG_MODEL - Model for sonnet/opus requests (default: gpt-4o)")
-        print(f"  SMALL_MODEL - Model for haiku requests (default: gpt-4o-mini)")
-        print(f"  HOST - Server host (default: 0.0.0.0)")
-        print(f"  PORT - Server port (default: 8082)")
-        print(f"  LOG_LEVEL - Logging level (default: WARNING)")
-        print(f"  MAX_TOKENS_LIMIT - Token limit (default: 4096)")
-        print(f"  MIN_TOKENS_LIMIT - Minimum token limit (default: 100)")
-        print(f"  DEFAULT_MAX_TOKENS - Default max_tokens for requests (default: 1024)")
-        print(f"  REQUEST_TIMEOUT - Request timeout in seconds (default: 90)")
-        print("")
-        print("Model mapping:")
-        print(f"  Claude haiku models -> {config.small_model}")
-        print(f"  Claude sonnet/opus models -> {config.big_model}")
-        sys.exit(0)
+    args = _build_parser().parse_args()
+
+    # Auto-reload forks a file-watching supervisor, so it is opt-in for development only
+    dev = args.dev
+    workers = 1 if dev else config.workers
 
     # Configuration summary
     print("🚀 Claude-to-OpenAI API Proxy v1.0.0")
@@ -93,7 +144,9 @@ def main():
     print(f"   Max Tokens Limit: {config.max_tokens_limit}")
     print(f"   Default Max Tokens: {config.default_max_tokens}")
     print(f"   Request Timeout: {config.request_timeout}s")
-    print(f"   Server: {config.host}:{config.port}")
+    print(f"   Server: {config.host}:{config.port} ({workers} workers)")
+    if dev:
+        print("   Dev mode: reload enabled")
     print("")
 
     # Start server
@@ -101,9 +154,15 @@ def main():
         "src.main:app",
         host=config.host,
         port=config.port,
+        workers=workers,  # 多进程分摊SSE解析和校验的CPU开销
         log_level=config.log_level.lower(),
-        reload=False,  # 禁用reload以避免日志混乱
-        access_log=True,  # 启用访问日志
+        # Pin the fast implementations so a missing extra fails loudly instead of falling back
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        ws="none",
+        reload=dev,  # 仅在--dev下启用reload，避免日志混乱和额外的监控进程
+        access_log=config.access_log,  # 访问日志默认关闭，可通过ACCESS_LOG开启
+        **(_RELOAD_OPTIONS if dev else {}),
     )
 
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Dict, Any, Optional, Union, Literal
 
 class ClaudeContentBlockText(BaseModel):
@@ -51,6 +51,9 @@ class ClaudeMessagesRequest(BaseModel):
     tool_choice: Optional[Dict[str, Any]] = None
     thinking: Optional[ClaudeThinkingConfig] = None
 
+    # Cached input token estimate, filled in lazily by the token estimator
+    _input_token_estimate: Optional[int] = PrivateAttr(default=None)
+
 class ClaudeTokenCountRequest(BaseModel):
     model: str
     messages: List[ClaudeMessage]
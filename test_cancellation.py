@@ -9,6 +9,8 @@ import httpx
 import json
 import time
 
+SEPARATOR = "=" * 50
+
 async def test_non_streaming_cancellation():
     """Test cancellation for non-streaming requests."""
     print("🧪 Testing non-streaming request cancellation...")
@@ -104,13 +106,13 @@ async def test_server_running():
 async def main():
     """Main test function."""
     print("🚀 Starting HTTP request cancellation tests")
-    print("=" * 50)
+    print(SEPARATOR)
     
     # Check if server is running
     if not await test_server_running():
         return
     
-    print("\n" + "=" * 50)
+    print("\n" + SEPARATOR)
     
     # Test non-streaming cancellation
     await test_non_streaming_cancellation()
@@ -118,7 +120,7 @@ async def main():
     # Test streaming cancellation  
     await test_streaming_cancellation()
     
-    print("\n" + "=" * 50)
+    print("\n" + SEPARATOR)
     print("✅ All cancellation tests completed!")
     print("\n💡 Note: The actual cancellation behavior depends on:")
     print("   - Client implementation (httpx in this case)")
@@ -0,0 +1,14 @@
+"""Shared pytest setup for the unit tests."""
+
+import os
+
+# src.core.config reads the environment once at import time and exits without
+# an API key, so pin the values the tests rely on before anything imports it.
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.update(
+    {
+        "MIN_TOKENS_LIMIT": "100",
+        "MAX_TOKENS_LIMIT": "4096",
+        "DEFAULT_MAX_TOKENS": "1024",
+    }
+)
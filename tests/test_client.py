@@ -0,0 +1,117 @@
+"""Unit tests for the raw SSE streaming in OpenAIClient."""
+
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.core import client as client_module
+from src.core.client import OpenAIClient, close_http_client, _CANCEL_FRAME, _DONE_FRAME, _TIMEOUT_FRAME_TEMPLATE
+
+
+def _data(payload: dict) -> bytes:
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+_TEXT = {"choices": [{"index": 0, "delta": {"content": "Hi"}, "finish_reason": None}]}
+_STOP = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+_AFTER_STOP = {"choices": [], "usage": {"prompt_tokens": 1, "completion_tokens": 1}}
+
+
+class _FakeStreamingResponse:
+    """Stands in for ``with_streaming_response.create()``, serving fixed byte chunks."""
+
+    def __init__(self, chunks, hang=False):
+        self.chunks = chunks
+        self.hang = hang
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def iter_bytes(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.hang:
+            await asyncio.Event().wait()
+
+
+def _client(response: _FakeStreamingResponse) -> OpenAIClient:
+    openai_client = OpenAIClient("sk-test", "https://upstream.invalid/v1")
+    completions = SimpleNamespace(with_streaming_response=SimpleNamespace(create=lambda **request: response))
+    openai_client._build_client = lambda http_client: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return openai_client
+
+
+def _stream(response: _FakeStreamingResponse, request_id=None) -> list:
+    async def collect():
+        stream = _client(response).create_chat_completion_stream({"model": "gpt-4o"}, request_id)
+        return [frame async for frame in stream]
+
+    return asyncio.run(collect())
+
+
+def test_stream_reassembles_lines_split_across_chunks():
+    raw = _data(_TEXT) + _data(_STOP)
+    response = _FakeStreamingResponse([raw[:3], raw[3:20], raw[20:]])
+
+    assert _stream(response) == [_data(_TEXT), _data(_STOP), _DONE_FRAME]
+    assert response.closed
+
+
+def test_stream_handles_crlf_comments_and_done():
+    text = orjson.dumps(_TEXT)
+    response = _FakeStreamingResponse(
+        [b": keep-alive\r\n\r\n", b"data: " + text + b"\r\n\r\n", b"data: [DONE]\r\n\r\n", b"data: " + text + b"\r\n"]
+    )
+
+    assert _stream(response) == [_data(_TEXT), _DONE_FRAME]
+
+
+def test_stream_stops_at_finish_reason():
+    response = _FakeStreamingResponse([_data(_TEXT), _data(_STOP), _data(_AFTER_STOP)], hang=True)
+
+    assert _stream(response) == [_data(_TEXT), _data(_STOP), _DONE_FRAME]
+
+
+def test_cancel_request_ends_stream_with_cancel_frame():
+    async def scenario():
+        openai_client = _client(_FakeStreamingResponse([_data(_TEXT)], hang=True))
+        stream = openai_client.create_chat_completion_stream({"model": "gpt-4o"}, "req-1")
+        first = await stream.__anext__()
+        assert openai_client.cancel_request("req-1")
+        rest = [frame async for frame in stream]
+        return first, rest, openai_client
+
+    first, rest, openai_client = asyncio.run(scenario())
+
+    assert first == _data(_TEXT)
+    assert rest == [_CANCEL_FRAME]
+    assert "req-1" not in openai_client.active_requests
+
+
+@pytest.mark.parametrize("request_id", [None, "req-1"])  # direct read, and read raced against cancel
+def test_idle_upstream_times_out(monkeypatch, request_id):
+    monkeypatch.setattr(client_module, "_STREAM_IDLE_TIMEOUT", 0.05)
+    response = _FakeStreamingResponse([_data(_TEXT)], hang=True)
+
+    assert _stream(response, request_id) == [_data(_TEXT), _TIMEOUT_FRAME_TEMPLATE % 1]
+    assert response.closed
+
+
+def test_client_rebinds_after_pool_is_closed():
+    openai_client = OpenAIClient("sk-test", "https://upstream.invalid/v1")
+    first = openai_client.client
+
+    # A second app lifespan in the same process must not reuse the closed pool
+    asyncio.run(close_http_client())
+    second = openai_client.client
+
+    assert second is not first
+    assert not openai_client._http_client.is_closed
+    # The shared pool keeps the SDK default of following upstream redirects
+    assert openai_client._http_client.follow_redirects
@@ -0,0 +1,62 @@
+"""Unit tests for response compression on /v1/messages."""
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import endpoints
+from src.main import app
+
+
+_LONG_TEXT = "lorem ipsum " * 200  # well above GZipMiddleware's minimum_size
+_USAGE = {"prompt_tokens": 12, "completion_tokens": 600}  # above MIN_TOKENS_LIMIT
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _messages_request(stream: bool) -> dict:
+    return {
+        "model": "claude-3-5-sonnet-20241022",
+        "max_tokens": 256,
+        "stream": stream,
+        "messages": [{"role": "user", "content": "Hello"}],
+    }
+
+
+def test_large_non_streaming_reply_is_gzipped(client, monkeypatch):
+    async def create_chat_completion(request, request_id=None):
+        return {
+            "id": "chatcmpl-1",
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": _LONG_TEXT}, "finish_reason": "stop"}],
+            "usage": _USAGE,
+        }
+
+    monkeypatch.setattr(endpoints.openai_client, "create_chat_completion", create_chat_completion)
+
+    response = client.post("/v1/messages", json=_messages_request(False), headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["content"] == [{"type": "text", "text": _LONG_TEXT}]
+
+
+def test_streaming_reply_is_not_compressed(client, monkeypatch):
+    async def create_chat_completion_stream(request, request_id=None):
+        for word in _LONG_TEXT.split():
+            chunk = {"choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+    monkeypatch.setattr(endpoints.openai_client, "create_chat_completion_stream", create_chat_completion_stream)
+
+    response = client.post("/v1/messages", json=_messages_request(True), headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+    assert response.text.endswith('event: message_stop\ndata: {"type":"message_stop"}\n\n')
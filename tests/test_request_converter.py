@@ -0,0 +1,42 @@
+"""Unit tests for Claude -> OpenAI request conversion."""
+
+import pytest
+
+from src.conversion.request_converter import convert_claude_to_openai
+from src.models.claude import ClaudeMessagesRequest
+
+
+_MODEL_MAP = {
+    "claude-3-haiku-20240307": "gpt-4o-mini",
+    "claude-3-5-sonnet-20241022": "gpt-4o",
+}
+
+
+class _ModelManager:
+    """Maps Claude models through a fixed table."""
+
+    map_claude_model_to_openai = staticmethod(_MODEL_MAP.__getitem__)
+
+
+_MODEL_MANAGER = _ModelManager()
+
+
+@pytest.mark.parametrize(
+    "max_tokens,expected",
+    [
+        (512, 512),  # within limits, kept as is
+        (0, 1024),  # invalid, falls back to DEFAULT_MAX_TOKENS
+        (50, 1024),  # below MIN_TOKENS_LIMIT, falls back to DEFAULT_MAX_TOKENS
+        (8192, 4096),  # above MAX_TOKENS_LIMIT, clamped
+    ],
+)
+def test_max_tokens_defaults_and_limits(max_tokens, expected):
+    request = ClaudeMessagesRequest(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": "Hello"}],
+    )
+
+    openai_request = convert_claude_to_openai(request, _MODEL_MANAGER)
+
+    assert openai_request["max_tokens"] == expected
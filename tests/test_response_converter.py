@@ -0,0 +1,178 @@
+"""Unit tests for OpenAI -> Claude response conversion."""
+
+import asyncio
+import logging
+
+import orjson
+import pytest
+
+from src.conversion import response_converter
+from src.conversion.response_converter import (
+    convert_openai_streaming_to_claude,
+    convert_openai_to_claude_response,
+)
+from src.models.claude import ClaudeMessagesRequest
+
+
+_LOGGER = logging.getLogger(__name__)
+_USAGE = {"prompt_tokens": 12, "completion_tokens": 5}
+
+
+@pytest.fixture(autouse=True)
+def _fixed_message_id(monkeypatch):
+    monkeypatch.setattr(response_converter, "token_hex", lambda nbytes: "0" * (2 * nbytes))
+
+
+def _chunk(delta=None, finish_reason=None, usage=None) -> bytes:
+    """Render one upstream chunk the way OpenAIClient forwards it."""
+    chunk = {"choices": [{"index": 0, "delta": delta or {}, "finish_reason": finish_reason}]}
+    if usage:
+        chunk["usage"] = usage
+    return b"data: " + orjson.dumps(chunk) + b"\n\n"
+
+
+def _frame(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+def _request() -> ClaudeMessagesRequest:
+    return ClaudeMessagesRequest(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=256,
+        messages=[{"role": "user", "content": "Hello"}],
+    )
+
+
+def _convert(*upstream: bytes) -> list:
+    async def stream():
+        for line in upstream:
+            yield line
+
+    async def collect():
+        return [frame async for frame in convert_openai_streaming_to_claude(stream(), _request(), _LOGGER)]
+
+    return asyncio.run(collect())
+
+
+_PREAMBLE = [
+    _frame(
+        "message_start",
+        '{"type":"message_start","message":{"id":"msg_000000000000000000000000","type":"message",'
+        '"role":"assistant","model":"claude-3-5-sonnet-20241022","content":[],"stop_reason":null,'
+        '"stop_sequence":null,"usage":{"input_tokens":0,"output_tokens":0}}}',
+    ),
+    _frame("content_block_start", '{"type":"content_block_start","index":0,"content_block":{"type":"text","text":""}}'),
+    _frame("ping", '{"type":"ping"}'),
+]
+_MESSAGE_STOP = _frame("message_stop", '{"type":"message_stop"}')
+
+
+def test_text_deltas_until_done():
+    frames = _convert(
+        _chunk({"role": "assistant", "content": ""}),
+        _chunk({"content": "Hel"}),
+        _chunk({"content": "lo"}, usage=_USAGE),
+        b"data: [DONE]\n\n",
+        _chunk({"content": "never sent"}),
+    )
+
+    assert frames == _PREAMBLE + [
+        _frame("content_block_delta", '{"type":"content_block_delta","index":0,"delta":{"type":"text_delta","text":"Hel"}}'),
+        _frame("content_block_delta", '{"type":"content_block_delta","index":0,"delta":{"type":"text_delta","text":"lo"}}'),
+        _frame("content_block_stop", '{"type":"content_block_stop","index":0}'),
+        _frame(
+            "message_delta",
+            '{"type":"message_delta","delta":{"stop_reason":"end_turn","stop_sequence":null},'
+            '"usage":{"input_tokens":12,"output_tokens":5}}',
+        ),
+        _MESSAGE_STOP,
+    ]
+
+
+def test_split_tool_call_forwards_argument_fragments():
+    frames = _convert(
+        _chunk({"tool_calls": [{"index": 0, "id": "call_1", "type": "function", "function": {"arguments": ""}}]}),
+        _chunk({"tool_calls": [{"index": 0, "function": {"name": "get_weather", "arguments": '{"loc'}}]}),
+        _chunk({"tool_calls": [{"index": 0, "function": {"arguments": 'ation": "NYC"}'}}]}),
+        _chunk({}, finish_reason="tool_calls", usage=_USAGE),
+    )
+
+    assert frames == _PREAMBLE + [
+        _frame(
+            "content_block_start",
+            '{"type":"content_block_start","index":1,"content_block":'
+            '{"type":"tool_use","id":"call_1","name":"get_weather","input":{}}}',
+        ),
+        _frame(
+            "content_block_delta",
+            '{"type":"content_block_delta","index":1,"delta":{"type":"input_json_delta","partial_json":"{\\"loc"}}',
+        ),
+        _frame(
+            "content_block_delta",
+            '{"type":"content_block_delta","index":1,"delta":{"type":"input_json_delta","partial_json":"ation\\": \\"NYC\\"}"}}',
+        ),
+        _frame("content_block_stop", '{"type":"content_block_stop","index":0}'),
+        _frame("content_block_stop", '{"type":"content_block_stop","index":1}'),
+        _frame(
+            "message_delta",
+            '{"type":"message_delta","delta":{"stop_reason":"tool_use","stop_sequence":null},'
+            '"usage":{"input_tokens":12,"output_tokens":5}}',
+        ),
+        _MESSAGE_STOP,
+    ]
+
+
+def test_upstream_error_chunk_ends_stream():
+    frames = _convert(
+        _chunk({"content": "Hi"}),
+        b'data: {"error":{"type":"api_error","status_code":429,"message":"Rate limit exceeded"}}\n\n',
+        _chunk({"content": "never sent"}),
+    )
+
+    assert frames == _PREAMBLE + [
+        _frame("content_block_delta", '{"type":"content_block_delta","index":0,"delta":{"type":"text_delta","text":"Hi"}}'),
+        _frame("error", '{"type":"error","error":{"type":"api_error","message":"Rate limit exceeded"}}'),
+    ]
+
+
+@pytest.mark.parametrize(
+    "message,finish_reason,content,stop_reason",
+    [
+        # plain text takes the fast path
+        ({"role": "assistant", "content": "Hello"}, "stop", [{"type": "text", "text": "Hello"}], "end_turn"),
+        (
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "get_weather", "arguments": '{"location": "NYC"}'},
+                    }
+                ],
+            },
+            "tool_calls",
+            [{"type": "tool_use", "id": "call_1", "name": "get_weather", "input": {"location": "NYC"}}],
+            "tool_use",
+        ),
+    ],
+)
+def test_non_streaming_response(message, finish_reason, content, stop_reason):
+    openai_response = {
+        "id": "chatcmpl-1",
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": _USAGE,
+    }
+
+    assert convert_openai_to_claude_response(openai_response, _request()) == {
+        "id": "chatcmpl-1",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-3-5-sonnet-20241022",
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 12, "output_tokens": 5},
+    }